@@ -1,7 +1,101 @@
 import streamlit as st
+import numpy as np
 import math
 
+# --- Erlang A Batch Function ---
+def erlang_a_fte_batch(
+    lambda_per_sec,
+    mu,
+    theta,
+    target_sla,
+    sla_threshold_sec,
+    target_answer_rate,
+    max_agents
+):
+    """
+    Finds the smallest number of agents on the floor meeting both targets,
+    for a whole batch of scenarios at once.
+
+    Takes rates per second as arrays (or scalars, broadcast together) and
+    evaluates every candidate N below max_agents for every
+    scenario in one NumPy pass. Returns an integer array with -1 wherever no
+    candidate is feasible.
+    """
+    lambda_per_sec, mu, theta, target_sla, sla_threshold_sec, target_answer_rate = (
+        np.broadcast_arrays(*(np.atleast_1d(np.asarray(x, dtype=float)) for x in (
+            lambda_per_sec, mu, theta, target_sla, sla_threshold_sec, target_answer_rate
+        )))
+    )
+    if max_agents <= 1:
+        return np.full(lambda_per_sec.shape, -1)
+
+    # Batch scenarios run along axis 0, candidate number of agents along axis 1
+    a = (lambda_per_sec / mu)[:, None]  # Offered load in Erlangs
+    n = np.arange(1, max_agents)
+
+    # System must be stable (traffic intensity < 1), so skip every N <= a
+    n_start = np.floor(a) + 1
+    candidate = n >= n_start
+
+    # Erlang B for every N, B(N) = (a^N / N!) / sum(a^k / k! for k in 0..N),
+    # evaluated in the log domain with log(a^k / k!) = k*log(a) - lgamma(k+1).
+    # This matches the recurrence B(N) = a*B(N-1) / (N + a*B(N-1)) and stays
+    # in [0, 1] without forming a^N or N! directly, so it cannot overflow.
+    # The k=0 term is exactly log(1) = 0, kept out of k*log(a) so that a zero
+    # offered load (log(a) = -inf) gives B = 0 rather than NaN.
+    with np.errstate(divide="ignore"):
+        log_a = np.log(a)
+    log_terms = np.concatenate(
+        (np.zeros_like(a), n * log_a - np.cumsum(np.log(n))), axis=1
+    )
+    erlang_b = np.exp(log_terms - np.logaddexp.accumulate(log_terms, axis=1))[:, 1:]
+
+    rho = a / n  # Traffic intensity
+    n_mu = n * mu[:, None]  # Total service rate of the floor
+
+    # Unstable N (rho >= 1) are masked out by `candidate` below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Probability of Waiting (Pw), using Erlang C derived from Erlang B
+        pw = erlang_b / (1 - rho + rho * erlang_b)
+
+        # --- Check against targets ---
+
+        # 1. Calculate Service Level (SL)
+        # SL = 1 - P(wait > threshold) = 1 - Pw * e^(-(N*µ - λ)*t)
+        # The exponential is taken in place, reusing the exponent's buffer
+        decay_sl = -(n_mu - lambda_per_sec[:, None]) * sla_threshold_sec[:, None]
+        np.exp(decay_sl, out=decay_sl)
+        service_level = 1 - (pw * decay_sl)
+
+        # 2. Calculate Answer Rate
+        # Answer Rate = 1 - Abandonment Rate
+        # Abandonment Rate = Pw * (θ / (N*µ + θ - λ)) -> this can be unstable
+        # A more stable approximation: Abandonment Rate = Pw * (θ / (N*µ + θ))
+        prob_abandon_given_wait = theta[:, None] / (n_mu + theta[:, None])
+        abandonment_rate = pw * prob_abandon_given_wait
+        answer_rate = 1 - abandonment_rate
+
+    # 3. Check if both conditions are met, and take the first feasible N per row
+    feasible = (
+        candidate
+        & (service_level >= target_sla[:, None])
+        & (answer_rate >= target_answer_rate[:, None])
+    )
+    idx = np.argmax(feasible, axis=1)
+    found = feasible[np.arange(len(idx)), idx]
+    return np.where(found, n[idx], -1)
+
+# --- Square-Root Staffing Estimate ---
+def sqrt_staffing(a, target_sla):
+    """
+    Estimates the agents needed for offered load a with the square-root
+    staffing rule N = a + z*sqrt(a), where z depends on the SLA target.
+    """
+    z = {0.8: 1.28, 0.9: 1.645, 0.95: 1.96}.get(round(target_sla, 2), 1.645)
+    return math.ceil(a + z * math.sqrt(a))
+
 # --- Erlang A Function (Revised for Answer Rate and Accuracy) ---
+@st.cache_data(max_entries=256)
 def erlang_a_fte(
     calls_per_hour,
     aht_sec,
@@ -22,43 +116,20 @@ def erlang_a_fte(
     mu = 1 / aht_sec
     theta = 1 / avg_patience_sec  # Abandonment rate (alpha in some texts)
 
-    # Iterate through the number of agents to find the minimum required
-    for n in range(1, max_agents):
-        rho = lambda_per_sec / (n * mu)  # Traffic intensity
-
-        # System must be stable (traffic intensity < 1)
-        if rho >= 1:
-            continue
-
-        # --- Erlang C base calculation ---
-        erlang_b = ((lambda_per_sec / mu)**n / math.factorial(n))
-        sum_erlang_b = sum(((lambda_per_sec / mu)**k / math.factorial(k)) for k in range(n))
-        p0 = 1 / (sum_erlang_b + erlang_b / (1 - rho))
-        
-        # Probability of Waiting (Pw), using the Erlang C formula
-        pw = (erlang_b / (1 - rho)) * p0
-
-        # --- Check against targets ---
-        
-        # 1. Calculate Service Level (SL)
-        # SL = 1 - P(wait > threshold) = 1 - Pw * e^(-(N*µ - λ)*t)
-        exponent_sl = -((n * mu) - lambda_per_sec) * sla_threshold_sec
-        service_level = 1 - (pw * math.exp(exponent_sl))
-
-        # 2. Calculate Answer Rate
-        # Answer Rate = 1 - Abandonment Rate
-        # Abandonment Rate = Pw * (θ / (N*µ + θ - λ)) -> this can be unstable
-        # A more stable approximation: Abandonment Rate = Pw * (θ / (N*µ + θ))
-        prob_abandon_given_wait = theta / (n * mu + theta)
-        abandonment_rate = pw * prob_abandon_given_wait
-        answer_rate = 1 - abandonment_rate
-
-        # 3. Check if both conditions are met
-        if service_level >= target_sla and answer_rate >= target_answer_rate:
-            # Return the number of agents, adjusted for shrinkage
-            return math.ceil(n / (1 - shrinkage))
+    n = int(erlang_a_fte_batch(
+        np.array([lambda_per_sec]),
+        mu,
+        theta,
+        target_sla,
+        sla_threshold_sec,
+        target_answer_rate,
+        max_agents
+    )[0])
+    if n < 0:
+        return None # Return None if no solution is found within max_agents
 
-    return None # Return None if no solution is found within max_agents
+    # Return the number of agents, adjusted for shrinkage
+    return math.ceil(n / (1 - shrinkage))
 
 # --- App Constants ---
 hours_of_operation = 9      # Total hours the call center is open
@@ -66,59 +137,141 @@ agent_work_hours = 8        # Hours an agent works in a shift
 # This ratio calculates the extra staff needed to cover all open hours with shorter shifts
 coverage_factor = hours_of_operation / agent_work_hours
 
+# --- Rostered FTE Function ---
+def total_fte(
+    inbound_fte_on_floor,
+    coverage_factor,
+    shrinkage,
+    outbound_referrals_per_day,
+    avg_time_per_referral_sec,
+    agent_work_hours
+):
+    """
+    Converts on-floor inbound agents and outbound workload into rostered
+    (inbound, outbound) FTE.
+
+    Shrinkage is a fraction. Works element-wise on scalars or NumPy arrays.
+    """
+    # Both figures are scaled by the same availability factor
+    inv_avail = 1.0 / (1.0 - shrinkage)
+    inbound_fte = inbound_fte_on_floor * coverage_factor * inv_avail
+    outbound_fte = outbound_referrals_per_day * avg_time_per_referral_sec * inv_avail / (agent_work_hours * 3600)
+    return inbound_fte, outbound_fte
+
+# --- FTE Calculation ---
+@st.cache_data(max_entries=256)
+def compute_fte(
+    calls_per_day,
+    aht_sec,
+    target_sla,
+    sla_threshold_sec,
+    target_answer_rate,
+    shrinkage,
+    outbound_referrals_per_day,
+    avg_time_per_referral_sec,
+    avg_patience_sec=150
+):
+    """
+    Calculates the rostered (inbound, outbound) FTE for the given UI inputs.
+
+    Percentages are taken as whole numbers, as entered in the sliders.
+    Returns None if no inbound staffing level meets the targets.
+    """
+    avg_calls_per_hour = calls_per_day / hours_of_operation
+    erlang_inputs = dict(
+        calls_per_hour=avg_calls_per_hour,
+        aht_sec=aht_sec,
+        target_sla=(target_sla / 100),
+        sla_threshold_sec=sla_threshold_sec,
+        target_answer_rate=(target_answer_rate / 100),
+        avg_patience_sec=avg_patience_sec,
+        shrinkage=0 # Shrinkage is applied to the final rostered FTE
+    )
+
+    # 1. Calculate FTE for Inbound Calls
+    # Cap the search just above the square-root staffing estimate. The first
+    # feasible N below the cap is already the exact answer, so the full search
+    # is only needed when nothing below the cap meets the targets.
+    n_hat = sqrt_staffing(avg_calls_per_hour * aht_sec / 3600, target_sla / 100)
+    inbound_fte_on_floor = erlang_a_fte(**erlang_inputs, max_agents=min(n_hat + 4, 100))
+    if not inbound_fte_on_floor:
+        inbound_fte_on_floor = erlang_a_fte(**erlang_inputs)
+
+    if not inbound_fte_on_floor:
+        return None
+
+    # 2. Adjust for shrinkage and shift coverage, and add Outbound Tasks
+    return total_fte(
+        inbound_fte_on_floor,
+        coverage_factor,
+        shrinkage / 100,
+        outbound_referrals_per_day,
+        avg_time_per_referral_sec,
+        agent_work_hours
+    )
+
 # --- Streamlit App UI ---
 st.set_page_config(layout="wide")
 st.title("📞 ECC Staffing Simulator")
 st.write("This tool helps determine the number of FTEs needed to staff an ECC Pod based on the Erlang model, which accounts for caller abandonment.")
 
-col1, = st.columns(1)
-
-with col1:
-    st.divider()
-    st.header("Inbound Demand")
-    calls_per_day = st.number_input("Total Calls per Day", min_value=1, value=250, help="Total Number of Inbound Calls expected for a day")
-    aht_sec = st.number_input("Average Handle Time (seconds)", min_value=1, value=600,help="Average Handle Time including ACW.")
-
-    st.divider()
-    st.header("Outbound Demand")
-    outbound_referrals_per_day = st.number_input("Outbound Tasks or Referrals per Day", min_value=0, value=90)
-    avg_time_per_referral_sec = st.number_input("Average Time per Outbound Task (seconds)", min_value=1, value=300)
+# Widget defaults live in session state so widgets are bound by key only
+input_defaults = {
+    "calls_per_day": 250,
+    "aht_sec": 600,
+    "outbound_referrals_per_day": 90,
+    "avg_time_per_referral_sec": 300,
+    "target_sla": 80,
+    "sla_threshold_sec": 30,
+    "target_answer_rate": 95,
+    "shrinkage": 20,
+}
+for key, value in input_defaults.items():
+    st.session_state.setdefault(key, value)
 
-    st.divider()
-    st.header("Goals and Shrinkage")
-    target_sla = st.slider("Target Service Level (%)", min_value=50, max_value=100, value=80, step=1, help="The percentage of calls to be answered within the threshold.")
-    sla_threshold_sec = st.number_input("Service Level Threshold (seconds)", value=30, step =5)
-    target_answer_rate = st.slider("Target Answer Rate (%)", min_value=50, max_value=100, value=95, step=1, help="The target percentage of total calls that should be answered (not abandoned).")
-    shrinkage = st.slider("Shrinkage (%)", min_value=0, max_value=100, value=20, step=1, help="Percentage of paid time that agents are not available to handle calls (meetings, breaks, etc.).")
+# Inputs are submitted together, so editing them does not rerun the app
+with st.form("ecc_inputs"):
+    col1, = st.columns(1)
 
+    with col1:
+        st.divider()
+        st.header("Inbound Demand")
+        st.number_input("Total Calls per Day", min_value=1, key="calls_per_day", help="Total Number of Inbound Calls expected for a day")
+        st.number_input("Average Handle Time (seconds)", min_value=1, key="aht_sec", help="Average Handle Time including ACW.")
 
+        st.divider()
+        st.header("Outbound Demand")
+        st.number_input("Outbound Tasks or Referrals per Day", min_value=0, key="outbound_referrals_per_day")
+        st.number_input("Average Time per Outbound Task (seconds)", min_value=1, key="avg_time_per_referral_sec")
 
+        st.divider()
+        st.header("Goals and Shrinkage")
+        st.slider("Target Service Level (%)", min_value=50, max_value=100, step=1, key="target_sla", help="The percentage of calls to be answered within the threshold.")
+        st.number_input("Service Level Threshold (seconds)", step =5, key="sla_threshold_sec")
+        st.slider("Target Answer Rate (%)", min_value=50, max_value=100, step=1, key="target_answer_rate", help="The target percentage of total calls that should be answered (not abandoned).")
+        st.slider("Shrinkage (%)", min_value=0, max_value=100, step=1, key="shrinkage", help="Percentage of paid time that agents are not available to handle calls (meetings, breaks, etc.).")
 
+    submitted = st.form_submit_button("Calculate Required FTE", type="primary", use_container_width=True)
 
-if st.button("Calculate Required FTE", type="primary", use_container_width=True):
+if submitted:
     # --- Calculations ---
-    avg_calls_per_hour = calls_per_day / hours_of_operation
-    avg_patience_sec = 150
-
-    # 1. Calculate FTE for Inbound Calls
-    inbound_fte_on_floor = erlang_a_fte(
-        calls_per_hour=avg_calls_per_hour,
-        aht_sec=aht_sec,
-        target_sla=(target_sla / 100),
-        sla_threshold_sec=sla_threshold_sec,
-        target_answer_rate=(target_answer_rate / 100),
-        avg_patience_sec=avg_patience_sec,
-        shrinkage=0 # Shrinkage is applied to the final rostered FTE
+    # Keep the result in session state so later reruns re-render it as-is
+    st.session_state["last_result"] = compute_fte(
+        calls_per_day=st.session_state.calls_per_day,
+        aht_sec=st.session_state.aht_sec,
+        target_sla=st.session_state.target_sla,
+        sla_threshold_sec=st.session_state.sla_threshold_sec,
+        target_answer_rate=st.session_state.target_answer_rate,
+        shrinkage=st.session_state.shrinkage,
+        outbound_referrals_per_day=st.session_state.outbound_referrals_per_day,
+        avg_time_per_referral_sec=st.session_state.avg_time_per_referral_sec
     )
-    
-    if inbound_fte_on_floor:
-        # Adjust for shrinkage and shift coverage to get total rostered FTE
-        total_inbound_fte = inbound_fte_on_floor * coverage_factor / (1 - (shrinkage/100))
-
-        # 2. Calculate FTE for Outbound Tasks
-        total_ob_seconds = outbound_referrals_per_day * avg_time_per_referral_sec
-        agent_productive_seconds_per_day = agent_work_hours * 3600 * (1 - (shrinkage/100))
-        outbound_fte = total_ob_seconds / agent_productive_seconds_per_day if agent_productive_seconds_per_day > 0 else 0
+
+if "last_result" in st.session_state:
+    result = st.session_state["last_result"]
+
+    if result:
+        total_inbound_fte, outbound_fte = result
 
         # --- Display Results ---
         st.success(f"### Total FTE Required: {total_inbound_fte + outbound_fte:.1f}")